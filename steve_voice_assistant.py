@@ -16,7 +16,7 @@ Core Features:
 
 Security Features:
 🔒 Prompt injection protection with input sanitization
-🛡️ Secure temporary file handling with encryption
+🛡️ Voice recordings processed in memory, never written to disk
 🔐 Encrypted conversation history storage
 📊 System resource monitoring and limits
 🚨 Comprehensive error handling and logging
@@ -34,7 +34,7 @@ Cost Management:
 Security Benefits:
 - Protection against prompt injection attacks
 - Encrypted storage of sensitive voice data
-- Secure deletion of temporary audio files
+- Voice recordings kept in memory only, never written to disk
 - Resource exhaustion prevention
 - Audit logging for security events
 - Safe error handling without information disclosure
@@ -52,31 +52,105 @@ Environment Variables Required:
 """
 
 import pyaudio
-import wave
 import numpy as np
 import time
 import os
 import re
 import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
 import pyttsx3
 import random
-import tempfile
-import psutil
+import string
 import logging
 import platform
-import subprocess
 import math
-from faster_whisper import WhisperModel
-import google.generativeai as genai
+from collections import deque
 from datetime import datetime, date
 import json
-from cryptography.fernet import Fernet
+import base64
 
-# Platform-specific imports
-if platform.system() == "Windows":
-    import winsound
+# Heavy dependencies (faster_whisper, google.generativeai, cryptography, psutil) and
+# the Windows-only winsound are imported where they are first used, keeping module
+# import cheap.
 
 class SteveVoiceAssistant:
+    # Chime definitions: name -> (frequencies Hz, durations ms, pause between tones s)
+    CHIMES = {
+        'listening': ((262, 330), (60, 60), 0.02),                   # C4, E4 - gentle interval
+        'conversation_start': ((262, 330, 392), (70, 70, 90), 0.03), # C4, E4, G4 - gentle major triad
+        'conversation_end': ((392, 330, 262), (80, 90, 120), 0.04),  # G4, E4, C4 - gentle descent
+        'conversation_listening': ((294,), (50,), 0),                # D4 - very gentle and brief
+        'speaking': ((330, 392), (40, 50), 0.02),                    # E4, G4 - gentle ascending
+        'thinking': ((349, 330, 294), (60, 60, 60), 0.02),           # F4, E4, D4 - gentle descent
+        'ready': ((330,), (80,), 0),                                 # E4 - warm and welcoming
+        'startup': ((262, 330, 392, 523), (80, 80, 90, 120), 0.04),  # C4, E4, G4, C5 - warm ascending
+    }
+    
+    # Static instructions that start every Gemini prompt
+    SYSTEM_PROMPT = "You are Steve, a helpful voice assistant. Respond naturally and conversationally in 1-2 sentences."
+    
+    # User-friendly replies for AI errors (details go to the secure log only)
+    GENERIC_ERROR_MESSAGES = (
+        "I'm having trouble processing that right now.",
+        "Sorry, I encountered an issue. Please try again.",
+        "I need a moment to think about that.",
+        "Let me try that again in a moment.",
+        "I'm experiencing some difficulty. Could you rephrase that?"
+    )
+    
+    # Where a streamed reply can be cut into speakable sentences
+    SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+    
+    # Text normalization and wake phrase matching, compiled once
+    NON_WORD_PATTERN = re.compile(r'[^\w\s]')
+    WHITESPACE_PATTERN = re.compile(r'\s+')
+    WAKE_PHRASE_PATTERNS = (
+        re.compile(r'hey\s*,?\s*steve\s*,?\s*'),
+        re.compile(r'hi\s*,?\s*steve\s*,?\s*'),
+    )
+    LEADING_PUNCTUATION = re.compile(r'^[,.\s]+')
+    # Byte-level approximation of normalize_text for a cheap wake word pre-check
+    # (non-ASCII characters are encoded as '?', which is mapped to a space too)
+    ASCII_PUNCT_TO_SPACE = bytes.maketrans(string.punctuation.encode(), b" " * len(string.punctuation))
+    
+    # Preferred (male) TTS voices per platform, matched against lowercased voice names
+    PREFERRED_VOICES = {
+        "Darwin": re.compile("|".join(map(re.escape, ['alex', 'tom', 'daniel', 'fred', 'ralph']))),
+        "Windows": re.compile("|".join(map(re.escape, ['david', 'mark', 'zira']))),
+    }
+    # Voice chosen on a previous run, so startup can skip enumerating voices
+    VOICE_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".steve", "voice.json")
+    
+    # Phrases that end a conversation besides GOODBYE_WORD (already normalized)
+    GOODBYE_PHRASES = (
+        "goodbye",
+        "bye steve",
+        "see you later steve",
+        "talk to you later steve",
+        "end conversation"
+    )
+    
+    # Dangerous patterns that could be prompt injection attempts
+    DANGEROUS_PATTERNS = [
+        r"ignore\s+previous",
+        r"forget\s+everything", 
+        r"new\s+instructions",
+        r"system\s*:",
+        r"assistant\s*:",
+        r"human\s*:",
+        r"disregard",
+        r"override",
+        r"pretend\s+you\s+are",
+        r"act\s+as\s+if",
+        r"</\w+>",  # HTML/XML tags
+        r"<\w+>",   # HTML/XML tags
+        r"\bprompt\b.*\binjection\b",
+        r"tell\s+me\s+your\s+instructions"
+    ]
+    # Compiled once into one alternation so sanitizing scans the input a single time
+    INJECTION_PATTERN = re.compile("|".join(f"(?:{p})" for p in DANGEROUS_PATTERNS), re.IGNORECASE)
+    
     def __init__(self):
         # Platform detection
         self.platform = platform.system()
@@ -90,19 +164,39 @@ class SteveVoiceAssistant:
         self.SILENCE_THRESHOLD = 150
         self.SILENCE_DURATION = 4.0
         self.MIN_SPEECH_DURATION = 0.5
+        self.VAD_AGGRESSIVENESS = 3  # webrtcvad mode, 0 (lenient) to 3 (strict)
+        self.VAD_FRAME_MS = 20  # webrtcvad accepts 10, 20 or 30 ms frames
+        self.VAD_WINDOW_FRAMES = 15  # Rolling window of frame decisions (300 ms)
+        self.VAD_VOICED_RATIO = 0.5  # Fraction of voiced frames that counts as speech
+        self.WHISPER_LANGUAGE = "en"  # Fixed language skips Whisper's detection pass
+        # int8 Whisper on ARM CPUs is prone to hallucinating on short/silent clips;
+        # strip non-speech with faster-whisper's Silero VAD before decoding there
+        self.WHISPER_VAD_FILTER = platform.machine().lower() in ("arm64", "aarch64")
         self.WAKE_WORD = "hey steve"
+        self.WAKE_WINDOW_SECONDS = 6  # Audio checked for the wake word each time
+        self.WAKE_HOP_SECONDS = 3  # New audio between checks; windows overlap by the rest
+        self.WAKEWORD_FRAME_SAMPLES = 1280  # openWakeWord scores 80 ms frames at 16 kHz
+        self.WAKEWORD_THRESHOLD = 0.5  # Score that counts as a wake word detection
         self.GOODBYE_WORD = "goodbye steve"
         self.ENABLE_CHIMES = True
+        self.normalized_wake = self.normalize_text(self.WAKE_WORD)
+        self.ascii_wake = self.normalized_wake.encode() if self.normalized_wake.isascii() else None
+        self.goodbye_phrases = (self.normalize_text(self.GOODBYE_WORD),) + self.GOODBYE_PHRASES
         self.conversation_mode = False
         
         # === Security Configuration ===
         self.setup_security()
         
         # === Platform-specific Audio Setup ===
+        self.tone_cache = {}
+        self.chime_cache = {}  # Chime name -> complete PCM buffer, tones and pauses included
+        self.tone_stream = None  # Opened on first chime, reused afterwards
+        self.tone_stream_lock = threading.Lock()
         self.setup_platform_audio()
         
         # === Conversation History & Cost Tracking ===
         self.conversation_history = []
+        self.history_tokens = 0  # Running token estimate of all history entries
         self.session_costs = {
             'input_tokens': 0,
             'output_tokens': 0,
@@ -137,46 +231,67 @@ class SteveVoiceAssistant:
         # Resource monitoring
         self.MIN_DISK_SPACE_MB = 100  # Minimum 100MB free space required
         self.MAX_MEMORY_PERCENT = 85  # Stop if memory usage > 85%
+        self.RESOURCE_CHECK_INTERVAL = 10  # Seconds a passed resource check stays valid
+        self.last_resource_check = None
         
         # Initialize audio
         self.audio = pyaudio.PyAudio()
+        self.vad = self.load_vad()
+        self.vad_buffer = b''
+        self.vad_window = deque(maxlen=self.VAD_WINDOW_FRAMES)
+        
+        # Speculative command transcription runs here while trailing silence is recorded
+        self.transcription_executor = ThreadPoolExecutor(max_workers=1)
+        self.pending_transcription = None
+        
+        # Wake word audio is captured continuously into a ring buffer by a callback stream
+        self.wake_stream = None
+        self.wake_ring = np.zeros(self.RATE * self.WAKE_WINDOW_SECONDS, dtype=np.int16)
+        self.wake_write_pos = 0
+        self.wake_filled = 0
+        self.wake_new_samples = 0
+        self.wake_total = 0  # Samples captured since the stream started
+        self.wake_read_total = 0  # Samples already scored by the wake word model
+        self.wake_lock = threading.Lock()
+        self.wake_ready = threading.Event()
+        self.wakeword_model = self.load_wakeword_model()
         
-        # Load Whisper model with platform-specific optimizations
-        print("Loading Whisper model...")
-        try:
-            if self.platform == "Darwin":  # macOS
-                # Try Metal GPU acceleration first
-                self.whisper_model = WhisperModel("turbo", device="cuda", compute_type="float16")
-                print("✅ GPU Whisper model loaded (Metal acceleration)")
-            else:
-                self.whisper_model = WhisperModel("turbo", device="cuda", compute_type="float16")
-                print("✅ GPU Whisper model loaded")
-        except:
-            self.whisper_model = WhisperModel("turbo", device="cpu", compute_type="int8")
-            print("✅ CPU Whisper model loaded")
-        
-        # Initialize Google AI
-        print("Initializing Google AI...")
         api_key = os.getenv('GOOGLE_AI_API_KEY')
         if not api_key:
             raise ValueError("Please set GOOGLE_AI_API_KEY environment variable")
         
-        genai.configure(api_key=api_key)
-        self.ai_model = genai.GenerativeModel('gemini-1.5-pro')
-        print("✅ Google AI model loaded")
+        # Load the Whisper model in the background while Google AI and TTS initialize.
+        # TTS stays on this thread: pyttsx3 engines must be used from the thread that
+        # created them.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            whisper_future = executor.submit(self.load_whisper_model)
+            
+            # Initialize Google AI
+            print("Initializing Google AI...")
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            self.ai_model = genai.GenerativeModel('gemini-1.5-pro')
+            print("✅ Google AI model loaded")
+            
+            # Initialize Text-to-Speech
+            print("Initializing Text-to-Speech...")
+            try:
+                self.tts_engine = pyttsx3.init()
+                self.setup_voice()
+                print("✅ Text-to-Speech loaded")
+            except Exception as e:
+                self.log_error("TTS initialization failed", e)
+                self.tts_engine = None
+            
+            self.whisper_model = whisper_future.result()
         
-        # Initialize Text-to-Speech
-        print("Initializing Text-to-Speech...")
-        try:
-            self.tts_engine = pyttsx3.init()
-            self.setup_voice()
-            print("✅ Text-to-Speech loaded")
-        except Exception as e:
-            self.log_error("TTS initialization failed", e)
-            self.tts_engine = None
+        # Pre-render chime waveforms
+        if self.ENABLE_CHIMES:
+            self.precompute_chimes()
         
-        # Calibrate audio levels
-        self.calibrate_audio()
+        # Calibrate audio levels (the VAD needs no threshold)
+        if self.vad is None:
+            self.calibrate_audio()
         
         # Display initial cost info
         self.display_cost_info()
@@ -184,6 +299,95 @@ class SteveVoiceAssistant:
         # Play startup chime to indicate system is ready
         self.play_startup_chime()
 
+    def load_whisper_model(self):
+        """Load the Whisper model with int8 quantization (int8_float16 on GPU, int8 on CPU).
+        
+        STEVE_WHISPER_COMPUTE_TYPE overrides the compute type, e.g. int8_float32 on
+        GPUs without fast FP16.
+        """
+        print("Loading Whisper model...")
+        import ctranslate2
+        from faster_whisper import WhisperModel
+        compute_type_override = os.getenv('STEVE_WHISPER_COMPUTE_TYPE')
+        if ctranslate2.get_cuda_device_count() > 0:
+            try:
+                model = WhisperModel("turbo", device="cuda",
+                                     compute_type=compute_type_override or "int8_float16")
+                print("✅ GPU Whisper model loaded")
+                return model
+            except Exception as e:
+                self.log_error("GPU Whisper model load failed, falling back to CPU", e)
+        model = WhisperModel("turbo", device="cpu",
+                             compute_type=compute_type_override or "int8",
+                             cpu_threads=os.cpu_count() or 0)
+        print("✅ CPU Whisper model loaded")
+        return model
+
+    def load_vad(self):
+        """Create a WebRTC voice activity detector, or None to fall back to RMS thresholds"""
+        try:
+            import webrtcvad
+            vad = webrtcvad.Vad(self.VAD_AGGRESSIVENESS)
+            print("✅ WebRTC VAD loaded")
+            return vad
+        except ImportError:
+            print("ℹ️ webrtcvad not installed, using calibrated silence threshold")
+            return None
+
+    def reset_vad(self):
+        """Drop buffered samples and frame decisions before a new recording"""
+        self.vad_buffer = b''
+        self.vad_window.clear()
+
+    def is_speech_chunk(self, data):
+        """Decide whether a recorded chunk contains speech.
+        
+        With webrtcvad the chunk is split into VAD_FRAME_MS frames (leftover bytes carry
+        over to the next chunk) and speech means the rolling voiced ratio reaches
+        VAD_VOICED_RATIO. Without it, the chunk's RMS is compared to SILENCE_THRESHOLD.
+        """
+        if self.vad is None:
+            return self.get_audio_level(data) > self.SILENCE_THRESHOLD
+        
+        frame_bytes = self.RATE * self.VAD_FRAME_MS // 1000 * 2  # int16 samples
+        buffer = self.vad_buffer + data
+        offset = 0
+        try:
+            while offset + frame_bytes <= len(buffer):
+                self.vad_window.append(self.vad.is_speech(buffer[offset:offset + frame_bytes], self.RATE))
+                offset += frame_bytes
+        except Exception as e:
+            self.log_error("VAD error, falling back to silence threshold", e)
+            self.vad = None
+            return self.get_audio_level(data) > self.SILENCE_THRESHOLD
+        self.vad_buffer = buffer[offset:]
+        
+        if not self.vad_window:
+            return False
+        return sum(self.vad_window) >= self.VAD_VOICED_RATIO * len(self.vad_window)
+
+    def load_wakeword_model(self):
+        """Load the optional openWakeWord model named by STEVE_WAKEWORD_MODEL.
+        
+        When loaded it scores every 80 ms of audio and its fire starts a conversation
+        directly; otherwise Whisper checks every wake window for the wake phrase.
+        """
+        model_path = os.getenv('STEVE_WAKEWORD_MODEL')
+        if not model_path:
+            return None
+        
+        try:
+            from openwakeword.model import Model
+            framework = "onnx" if model_path.endswith(".onnx") else "tflite"
+            model = Model(wakeword_models=[model_path], inference_framework=framework)
+            print(f"✅ Wake word model loaded: {os.path.basename(model_path)}")
+            return model
+        except ImportError:
+            print("⚠️ STEVE_WAKEWORD_MODEL is set but openwakeword is not installed")
+        except Exception as e:
+            self.log_error("Wake word model loading failed", e)
+        return None
+
     def display_cost_info(self):
         """Display current cost information"""
         print(f"\n💰 Cost Tracking Enabled")
@@ -211,11 +415,15 @@ class SteveVoiceAssistant:
     
     def setup_macos_audio(self):
         """Setup macOS-specific audio configuration"""
-        # Check for Metal GPU support
+        # Check for Metal GPU support without shelling out to the slow system_profiler
         try:
-            result = subprocess.run(['system_profiler', 'SPDisplaysDataType'], 
-                                  capture_output=True, text=True, timeout=5)
-            if 'Metal' in result.stdout:
+            try:
+                from Metal import MTLCreateSystemDefaultDevice  # pyobjc, if installed
+                has_metal = MTLCreateSystemDefaultDevice() is not None
+            except ImportError:
+                has_metal = os.path.exists("/System/Library/Frameworks/Metal.framework")
+            
+            if has_metal:
                 print("✅ Metal GPU support detected")
             else:
                 print("⚠️ Metal GPU support not detected")
@@ -230,65 +438,119 @@ class SteveVoiceAssistant:
         """Setup generic cross-platform audio"""
         print("✅ Generic audio support ready")
     
+    def precompute_chimes(self):
+        """Render every chime up front so playback is a single buffer write"""
+        if self.platform == "Windows":
+            return  # winsound plays tone by tone; rendered buffers would go unused
+        for name in self.CHIMES:
+            self.chime_cache[name] = self.render_chime(name)
+    
+    def render_chime(self, name, sample_rate=44100):
+        """Render a chime's tones and pauses into one 16-bit PCM buffer"""
+        frequencies, durations, pause_between = self.CHIMES[name]
+        silence = b'\x00\x00' * int(pause_between * sample_rate)
+        return silence.join(self.generate_tone(freq, duration, sample_rate)
+                            for freq, duration in zip(frequencies, durations))
+    
     def generate_tone(self, frequency, duration_ms, sample_rate=44100, volume=0.3):
-        """Generate a sine wave tone using numpy"""
+        """Generate a sine wave tone using numpy (cached per tone)"""
+        key = (frequency, duration_ms, sample_rate, volume)
+        cached = self.tone_cache.get(key)
+        if cached:
+            return cached
+        
         try:
-            duration_s = duration_ms / 1000.0
-            frames = int(duration_s * sample_rate)
-            
-            # Generate sine wave
-            t = np.linspace(0, duration_s, frames, False)
-            wave_data = np.sin(2 * np.pi * frequency * t)
-            
-            # Apply volume and convert to 16-bit integers
-            wave_data = (wave_data * volume * 32767).astype(np.int16)
-            
-            return wave_data.tobytes()
+            frames = int(duration_ms * sample_rate / 1000)
+            
+            # Tones are generated once per process (see precompute_chimes), taking
+            # ~20µs each; a JIT (e.g. numba) would cost far more in import/compile time,
+            # and a pure-Python math.sin/struct loop is 3-70x slower even for 1ms tones.
+            # Generate sine wave in float32 (half the memory traffic of float64)
+            wave_data = np.arange(frames, dtype=np.float32)
+            wave_data *= np.float32(2 * np.pi * frequency / sample_rate)
+            np.sin(wave_data, out=wave_data)
+            
+            # Apply volume in place and convert to 16-bit integers
+            wave_data *= np.float32(volume * 32767)
+            
+            tone_data = wave_data.astype(np.int16).tobytes()
+            self.tone_cache[key] = tone_data
+            return tone_data
         except Exception as e:
             self.log_error("Failed to generate tone", e)
             return b''
     
     def play_tone_cross_platform(self, frequency, duration_ms):
         """Play a tone using cross-platform method"""
-        if self.platform == "Windows" and 'winsound' in globals():
+        if self.platform == "Windows":
             try:
+                import winsound
                 winsound.Beep(int(frequency), int(duration_ms))
                 return
             except:
                 pass
         
         # Fallback to PyAudio tone generation (works on all platforms)
+        self.write_tone_data(self.generate_tone(frequency, duration_ms))
+    
+    def write_tone_data(self, tone_data):
+        """Play 44.1kHz 16-bit mono PCM on the shared output stream"""
+        if not tone_data:
+            return
+        
         try:
-            tone_data = self.generate_tone(frequency, duration_ms)
-            if not tone_data:
-                return
-            
-            # Play using PyAudio
-            stream = self.audio.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=44100,
-                output=True
-            )
-            stream.write(tone_data)
-            stream.stop_stream()
-            stream.close()
+            # Play using the shared PyAudio output stream (chime threads take turns)
+            with self.tone_stream_lock:
+                if self.tone_stream is None:
+                    self.tone_stream = self.audio.open(
+                        format=pyaudio.paInt16,
+                        channels=1,
+                        rate=44100,
+                        output=True
+                    )
+                self.tone_stream.write(tone_data)
             
         except Exception as e:
             self.log_error("Failed to play tone", e)
+            self.close_tone_stream()
     
-    def play_chime_sequence(self, frequencies, durations, pause_between=0.02):
-        """Play a sequence of tones with pauses"""
+    def close_tone_stream(self):
+        """Close the shared chime output stream"""
+        with self.tone_stream_lock:
+            if self.tone_stream is not None:
+                try:
+                    self.tone_stream.stop_stream()
+                    self.tone_stream.close()
+                except Exception:
+                    pass
+                self.tone_stream = None
+    
+    def play_chime(self, name, background=True):
+        """Play a named chime, by default without blocking the caller"""
+        if not self.ENABLE_CHIMES:
+            return
+        
         def chime():
             try:
-                for i, (freq, duration) in enumerate(zip(frequencies, durations)):
-                    self.play_tone_cross_platform(freq, duration)
-                    if i < len(frequencies) - 1 and pause_between > 0:
-                        time.sleep(pause_between)
+                if self.platform == "Windows":
+                    # winsound.Beep plays tone by tone (with PyAudio fallback per tone)
+                    frequencies, durations, pause_between = self.CHIMES[name]
+                    for i, (freq, duration) in enumerate(zip(frequencies, durations)):
+                        self.play_tone_cross_platform(freq, duration)
+                        if i < len(frequencies) - 1 and pause_between > 0:
+                            time.sleep(pause_between)
+                else:
+                    chime_data = self.chime_cache.get(name)
+                    if chime_data is None:
+                        chime_data = self.chime_cache[name] = self.render_chime(name)
+                    self.write_tone_data(chime_data)
             except Exception as e:
                 self.log_error("Failed to play chime sequence", e)
         
-        threading.Thread(target=chime, daemon=True).start()
+        if background:
+            threading.Thread(target=chime, daemon=True).start()
+        else:
+            chime()
     
     # ===== SECURITY METHODS =====
     
@@ -303,12 +565,10 @@ class SteveVoiceAssistant:
             filemode='a'
         )
         
-        # Generate encryption key for conversation history
-        self.history_key = Fernet.generate_key()
-        self.cipher = Fernet(self.history_key)
-        
-        # Initialize secure temp file tracking
-        self.temp_files = []
+        # Generate encryption key for conversation history (AES-GCM, single AES-NI pass)
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        self.history_key = AESGCM.generate_key(bit_length=128)
+        self.cipher = AESGCM(self.history_key)
         
         print("🔒 Security components initialized")
 
@@ -317,29 +577,10 @@ class SteveVoiceAssistant:
         if not user_input:
             return ""
         
-        # List of dangerous patterns that could be prompt injection attempts
-        dangerous_patterns = [
-            r"ignore\s+previous",
-            r"forget\s+everything", 
-            r"new\s+instructions",
-            r"system\s*:",
-            r"assistant\s*:",
-            r"human\s*:",
-            r"disregard",
-            r"override",
-            r"pretend\s+you\s+are",
-            r"act\s+as\s+if",
-            r"</\w+>",  # HTML/XML tags
-            r"<\w+>",   # HTML/XML tags
-            r"\bprompt\b.*\binjection\b",
-            r"tell\s+me\s+your\s+instructions"
-        ]
-        
         sanitized = user_input.strip()
         
-        # Remove dangerous patterns
-        for pattern in dangerous_patterns:
-            sanitized = re.sub(pattern, "[filtered]", sanitized, flags=re.IGNORECASE)
+        # Remove dangerous patterns in a single pass
+        sanitized = self.INJECTION_PATTERN.sub("[filtered]", sanitized)
         
         # Limit length to prevent very long inputs
         if len(sanitized) > 500:
@@ -355,59 +596,11 @@ class SteveVoiceAssistant:
         
         return sanitized
 
-    def create_secure_temp_file(self, suffix=".wav", prefix="steve_audio_"):
-        """Create a secure temporary file"""
-        try:
-            fd, temp_path = tempfile.mkstemp(suffix=suffix, prefix=prefix, dir=None)
-            os.close(fd)  # Close file descriptor, keep path
-            
-            # Track temp file for cleanup
-            self.temp_files.append(temp_path)
-            
-            # Set restrictive permissions (owner only)
-            os.chmod(temp_path, 0o600)
-            
-            return temp_path
-        except Exception as e:
-            self.log_error("Failed to create secure temp file", e)
-            raise
-
-    def secure_delete_file(self, filepath):
-        """Securely delete a file by overwriting it first"""
-        if not os.path.exists(filepath):
-            return
-        
-        try:
-            # Get file size
-            file_size = os.path.getsize(filepath)
-            
-            # Overwrite with random data (3 passes for extra security)
-            with open(filepath, "r+b") as f:
-                for _ in range(3):
-                    f.seek(0)
-                    f.write(os.urandom(file_size))
-                    f.flush()
-                    os.fsync(f.fileno())
-            
-            # Finally delete the file
-            os.remove(filepath)
-            
-            # Remove from tracking list
-            if filepath in self.temp_files:
-                self.temp_files.remove(filepath)
-                
-        except Exception as e:
-            self.log_error("Failed to securely delete file", e)
-            # Fallback to regular deletion
-            try:
-                os.remove(filepath)
-            except:
-                pass
-
     def encrypt_text(self, text):
         """Encrypt text using conversation history encryption"""
         try:
-            return self.cipher.encrypt(text.encode()).decode()
+            nonce = os.urandom(12)  # Unique 96-bit nonce per message
+            return base64.b64encode(nonce + self.cipher.encrypt(nonce, text.encode(), None)).decode()
         except Exception as e:
             self.log_error("Failed to encrypt text", e)
             return text  # Fallback to plain text
@@ -415,13 +608,21 @@ class SteveVoiceAssistant:
     def decrypt_text(self, encrypted_text):
         """Decrypt text using conversation history encryption"""
         try:
-            return self.cipher.decrypt(encrypted_text.encode()).decode()
+            data = base64.b64decode(encrypted_text)
+            return self.cipher.decrypt(data[:12], data[12:], None).decode()
         except Exception as e:
             self.log_error("Failed to decrypt text", e)
             return encrypted_text  # Return as-is if decryption fails
 
     def check_system_resources(self):
         """Check system resources before proceeding with operations"""
+        # Disk and memory don't drift meaningfully within a few seconds, so reuse a recent pass
+        now = time.monotonic()
+        if (self.last_resource_check is not None and
+                now - self.last_resource_check < self.RESOURCE_CHECK_INTERVAL):
+            return True
+        
+        import psutil
         try:
             # Check available disk space
             disk_usage = psutil.disk_usage('.')
@@ -445,6 +646,7 @@ class SteveVoiceAssistant:
                 if memory.percent > self.MAX_MEMORY_PERCENT:
                     raise Exception(f"Memory usage too high: {memory.percent}%")
             
+            self.last_resource_check = now
             return True
             
         except Exception as e:
@@ -504,6 +706,8 @@ class SteveVoiceAssistant:
 
     def log_security_event(self, event, details=None):
         """Log security events"""
+        if not logging.getLogger().isEnabledFor(logging.INFO):
+            return  # Skip building and serializing events nobody will record
         event_data = {
             'event': event,
             'timestamp': datetime.now().isoformat(),
@@ -519,19 +723,24 @@ class SteveVoiceAssistant:
         self.log_error("AI processing error", exception)
         
         # Return user-friendly messages
-        generic_messages = [
-            "I'm having trouble processing that right now.",
-            "Sorry, I encountered an issue. Please try again.",
-            "I need a moment to think about that.",
-            "Let me try that again in a moment.",
-            "I'm experiencing some difficulty. Could you rephrase that?"
-        ]
-        
-        return random.choice(generic_messages)
+        return self.GENERIC_ERROR_MESSAGES[random.randrange(len(self.GENERIC_ERROR_MESSAGES))]
 
     def estimate_tokens(self, text):
-        """Rough token estimation (4 chars ≈ 1 token for English)"""
-        return len(text) / 4
+        """Rough token estimation (4 chars ≈ 1 token for English), as an integer"""
+        return len(text) >> 2
+
+    def get_token_usage(self, response, prompt, ai_response):
+        """Get exact token counts from the response's usage metadata, estimating if absent"""
+        usage = getattr(response, 'usage_metadata', None)
+        input_tokens = getattr(usage, 'prompt_token_count', 0)
+        output_tokens = getattr(usage, 'candidates_token_count', 0)
+        
+        if not input_tokens:
+            input_tokens = self.estimate_tokens(prompt)
+        if not output_tokens:
+            output_tokens = self.estimate_tokens(ai_response)
+        
+        return input_tokens, output_tokens
 
     def calculate_cost(self, input_tokens, output_tokens):
         """Calculate cost based on token usage"""
@@ -567,64 +776,38 @@ class SteveVoiceAssistant:
             return
         
         try:
-            # Estimate current history size by decrypting and calculating
-            total_history_text = ""
-            for entry in self.conversation_history:
-                if entry.get('encrypted', False):
-                    user_text = self.decrypt_text(entry['user'])
-                    assistant_text = self.decrypt_text(entry['assistant'])
-                else:
-                    user_text = entry['user']
-                    assistant_text = entry['assistant']
-                total_history_text += user_text + assistant_text
-            
-            estimated_tokens = self.estimate_tokens(total_history_text)
-            
-            # If history is too long, trim from the beginning
-            while (estimated_tokens > self.MAX_HISTORY_TOKENS or 
+            # Token counts are tracked per entry when added, so no decryption is needed here
+            while (self.history_tokens > self.MAX_HISTORY_TOKENS or 
                    len(self.conversation_history) > self.MAX_CONVERSATION_TURNS):
                 
                 if len(self.conversation_history) <= 1:
                     break
-                    
+                
+                reason = 'token_limit_exceeded' if self.history_tokens > self.MAX_HISTORY_TOKENS else 'turn_limit_exceeded'
                 removed = self.conversation_history.pop(0)
+                self.history_tokens -= removed['tokens']
                 print(f"🧹 Trimmed old conversation turn (history management)")
                 
                 # Log the trimming for security audit
                 self.log_security_event("Conversation history trimmed", {
-                    'reason': 'token_limit_exceeded' if estimated_tokens > self.MAX_HISTORY_TOKENS else 'turn_limit_exceeded',
+                    'reason': reason,
                     'remaining_turns': len(self.conversation_history)
                 })
                 
-                # Recalculate
-                total_history_text = ""
-                for entry in self.conversation_history:
-                    if entry.get('encrypted', False):
-                        user_text = self.decrypt_text(entry['user'])
-                        assistant_text = self.decrypt_text(entry['assistant'])
-                    else:
-                        user_text = entry['user']
-                        assistant_text = entry['assistant']
-                    total_history_text += user_text + assistant_text
-                estimated_tokens = self.estimate_tokens(total_history_text)
-                
         except Exception as e:
             self.log_error("Failed to manage conversation history", e)
             # In case of error, clear history to prevent issues
             self.conversation_history = []
+            self.history_tokens = 0
 
     def build_conversation_prompt(self, user_input):
         """Build prompt with encrypted conversation history"""
         if not self.ENABLE_HISTORY or not self.conversation_history:
             # No history, just use current input
-            return f"""You are Steve, a helpful voice assistant. Respond naturally and conversationally in 1-2 sentences.
-
-User said: {user_input}"""
+            return f"{self.SYSTEM_PROMPT}\n\nUser said: {user_input}"
         
-        # Build prompt with decrypted conversation history
-        prompt = """You are Steve, a helpful voice assistant. Respond naturally and conversationally in 1-2 sentences.
-
-Conversation history:"""
+        # Build prompt with decrypted conversation history (joined once, not concatenated per turn)
+        parts = [self.SYSTEM_PROMPT, "\n\nConversation history:"]
         
         try:
             for entry in self.conversation_history:
@@ -637,19 +820,15 @@ Conversation history:"""
                     user_text = entry['user']
                     assistant_text = entry['assistant']
                 
-                prompt += f"\nUser: {user_text}"
-                prompt += f"\nSteve: {assistant_text}"
+                parts.append(f"\nUser: {user_text}\nSteve: {assistant_text}")
         except Exception as e:
             self.log_error("Failed to build conversation prompt", e)
             # Fallback to no history
-            return f"""You are Steve, a helpful voice assistant. Respond naturally and conversationally in 1-2 sentences.
-
-User said: {user_input}"""
+            return f"{self.SYSTEM_PROMPT}\n\nUser said: {user_input}"
         
-        prompt += f"\n\nUser: {user_input}"
-        prompt += "\nSteve:"
+        parts.append(f"\n\nUser: {user_input}\nSteve:")
         
-        return prompt
+        return "".join(parts)
 
     def get_ai_response(self, user_input):
         """Enhanced AI response with comprehensive security measures"""
@@ -677,43 +856,36 @@ User said: {user_input}"""
             # 5. Build prompt with history
             prompt = self.build_conversation_prompt(sanitized_input)
             
-            # 6. Estimate input tokens
-            estimated_input_tokens = self.estimate_tokens(prompt)
-            print(f"📊 Estimated input tokens: {estimated_input_tokens:.0f}")
-            
-            # 7. Get AI response
-            response = self.ai_model.generate_content(prompt)
-            ai_time = time.time() - start_time
+            # 6. Stream AI response, speaking each sentence as soon as it is complete
+            response, ai_response, ai_time = self.stream_and_speak_response(prompt, start_time)
             
             print(f"⚡ AI responded in {ai_time:.2f}s")
             
-            ai_response = response.text.strip()
-            
-            # 8. Estimate output tokens
-            estimated_output_tokens = self.estimate_tokens(ai_response)
+            # 7. Get billed token counts (reported by the API, estimated as a fallback)
+            input_tokens, output_tokens = self.get_token_usage(response, prompt, ai_response)
             
-            # 9. Update costs and usage tracking
-            call_cost = self.update_session_costs(estimated_input_tokens, estimated_output_tokens)
+            # 8. Update costs and usage tracking
+            call_cost = self.update_session_costs(input_tokens, output_tokens)
             self.update_api_usage()
             
-            # 10. Display cost info
-            self.display_cost_summary(call_cost, estimated_input_tokens, estimated_output_tokens)
+            # 9. Display cost info
+            self.display_cost_summary(call_cost, input_tokens, output_tokens)
             
-            # 11. Add to encrypted conversation history
+            # 10. Add to encrypted conversation history
             if self.ENABLE_HISTORY:
                 encrypted_user_input = self.encrypt_text(user_input)  # Store original, not sanitized
                 encrypted_ai_response = self.encrypt_text(ai_response)
                 
+                entry_tokens = self.estimate_tokens(user_input + ai_response)
                 self.conversation_history.append({
                     'user': encrypted_user_input,
                     'assistant': encrypted_ai_response,
                     'timestamp': datetime.now().isoformat(),
                     'cost': call_cost,
+                    'tokens': entry_tokens,
                     'encrypted': True
                 })
-            
-            # 12. Speak the response
-            self.speak_response(ai_response)
+                self.history_tokens += entry_tokens
             
             return ai_response
             
@@ -723,12 +895,70 @@ User said: {user_input}"""
             self.speak_response(error_message)
             return error_message
 
+    def stream_and_speak_response(self, prompt, start_time):
+        """Stream the Gemini response and speak it sentence by sentence.
+        
+        A background thread reads the stream while this thread speaks, so TTS for the
+        first sentence overlaps generation of the rest. TTS stays on the calling thread
+        because pyttsx3 engines are bound to the thread that created them. If the stream
+        fails after text has arrived, the partial answer is returned so its usage is
+        still recorded.
+        """
+        response = self.ai_model.generate_content(prompt, stream=True)
+        sentences = queue.Queue()
+        chunks = []
+        ai_time = None
+        
+        def read_stream():
+            nonlocal ai_time
+            pending = ""
+            try:
+                for chunk in response:
+                    if not chunk.parts:
+                        continue  # e.g. a trailing finish-reason chunk; .text raises on these
+                    chunks.append(chunk.text)
+                    pending += chunk.text
+                    *complete, pending = self.SENTENCE_BOUNDARY.split(pending)
+                    for sentence in complete:
+                        if sentence.strip():
+                            sentences.put(sentence.strip())
+                if pending.strip():
+                    sentences.put(pending.strip())
+                sentences.put(None)
+            except Exception as e:
+                sentences.put(e)
+            finally:
+                # Generation time only; speaking the queued sentences is not included
+                ai_time = time.time() - start_time
+        
+        threading.Thread(target=read_stream, daemon=True).start()
+        
+        first_sentence = True
+        while True:
+            item = sentences.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                if not chunks:
+                    raise item
+                # Part of the answer was already generated (and billed), so keep it
+                self.log_error("AI response stream interrupted", item)
+                print("⚠️ Response cut short")
+                break
+            if first_sentence:
+                print(f"⚡ First sentence in {time.time() - start_time:.2f}s")
+            self.speak_response(item, chime=first_sentence)
+            first_sentence = False
+        
+        return response, "".join(chunks).strip(), ai_time
+
     def start_new_conversation(self):
         """Start a new conversation (clear history)"""
         if self.conversation_history:
             print(f"🗂️ Cleared conversation history ({len(self.conversation_history)} turns)")
             
         self.conversation_history = []
+        self.history_tokens = 0
         
         # Display session summary
         duration = datetime.now() - self.session_costs['start_time']
@@ -772,13 +1002,9 @@ User said: {user_input}"""
                 
                 print("🎤 Listening in conversation mode...")
                 
-                # Record user input
-                command_file = self.record_voice_command()
-                if command_file:
-                    command_text = self.transcribe_command(command_file)
-                    # Note: transcribe_command now handles secure file deletion
-                else:
-                    command_text = None
+                # Record user input (kept in memory, never written to disk)
+                command_audio = self.record_voice_command()
+                command_text = self.transcribe_command(command_audio)
                 
                 if command_text:
                     # Check if user wants to end conversation
@@ -838,24 +1064,38 @@ User said: {user_input}"""
             try:
                 if not self.conversation_mode:
                     # Wake word listening mode
-                    wake_file = self.record_wake_word_check(6)
-                    wake_detected, full_text = self.check_wake_word(wake_file)
+                    if self.wake_stream is None:
+                        self.check_system_resources()
+                        self.start_wake_stream()
+                    
+                    if self.wakeword_model is not None:
+                        # The model's fire is the detection; the window isn't transcribed
+                        self.wait_for_wakeword()
+                        wake_detected, full_text = True, None
+                    else:
+                        wake_audio = self.next_wake_window()
+                        wake_detected, full_text = self.check_wake_word(wake_audio)
                     
                     if wake_detected:
                         print("🚀 Wake word detected!")
                         
+                        # Release the microphone; capture restarts with an empty buffer
+                        # afterwards so the same wake phrase isn't heard twice
+                        self.stop_wake_stream()
+                        
                         # Start new conversation (clear any previous history)
                         self.start_new_conversation()
                         
                         # Check if command was included in the wake phrase
-                        command_from_wake = self.extract_command_from_wake_phrase(full_text)
+                        command_from_wake = self.extract_command_from_wake_phrase(full_text) if full_text else None
                         
                         if command_from_wake and len(command_from_wake) > 3:
                             # Handle the initial command
                             print(f"✅ Initial command: '{command_from_wake}'")
                             self.get_ai_response(command_from_wake)
-                        else:
-                            # Just acknowledgment, no specific command
+                        elif full_text is not None:
+                            # Just acknowledgment, no specific command (after a model
+                            # detection the user is likely still talking, so skip this)
                             greetings = [
                                 "Hello! How can I help you?",
                                 "Hi there! What can I do for you?", 
@@ -871,9 +1111,6 @@ User said: {user_input}"""
                         # After conversation ends, show ready message
                         print(f"\n👂 Back to listening for wake word: '{self.WAKE_WORD}'")
                         self.play_ready_chime()
-                    
-                    # Brief pause between wake word checks
-                    time.sleep(0.1)
                 
             except KeyboardInterrupt:
                 print("\n🛑 Goodbye!")
@@ -891,6 +1128,7 @@ User said: {user_input}"""
             except Exception as e:
                 print(f"❌ Main loop error: {e}")
                 print("Continuing...")
+                self.stop_wake_stream()
                 time.sleep(1)
 
     # ... (All other methods remain the same as original) ...
@@ -901,44 +1139,8 @@ User said: {user_input}"""
             return
             
         try:
-            voices = self.tts_engine.getProperty('voices')
-            
-            # Display available voices
-            print("Available voices:")
-            for i, voice in enumerate(voices[:5]):  # Show first 5 voices
-                gender = "♂️" if "male" in voice.name.lower() else "♀️"
-                print(f"  {i}: {gender} {voice.name}")
-            
-            selected_voice = None
-            
-            # Platform-specific voice selection
-            if self.platform == "Darwin":  # macOS
-                # macOS voice preferences (male voices)
-                macos_male_voices = ['alex', 'tom', 'daniel', 'fred', 'ralph']
-                for voice in voices:
-                    voice_name = voice.name.lower()
-                    if any(preferred in voice_name for preferred in macos_male_voices):
-                        selected_voice = voice
-                        break
-                        
-            elif self.platform == "Windows":
-                # Windows voice preferences
-                windows_male_voices = ['david', 'mark', 'zira']
-                for voice in voices:
-                    voice_name = voice.name.lower()
-                    if any(preferred in voice_name for preferred in windows_male_voices):
-                        selected_voice = voice
-                        break
-            
-            # Fallback to first available voice
-            if not selected_voice and len(voices) > 0:
-                selected_voice = voices[0]
-            
-            if selected_voice:
-                self.tts_engine.setProperty('voice', selected_voice.id)
-                print(f"🗣️ Selected voice: {selected_voice.name}")
-            else:
-                print("⚠️ No voices available")
+            if not self.apply_cached_voice():
+                self.select_voice()
             
             # Configure speech settings with platform adjustments
             if self.platform == "Darwin":
@@ -952,7 +1154,62 @@ User said: {user_input}"""
         except Exception as e:
             self.log_error("Voice setup error", e)
 
-    def speak_response(self, text):
+    def apply_cached_voice(self):
+        """Reuse the voice selected on a previous run; False if there is none or it's gone"""
+        try:
+            with open(self.VOICE_CACHE_FILE, "r") as f:
+                cached = json.load(f)
+            if cached.get('platform') != self.platform:
+                return False
+            self.tts_engine.setProperty('voice', cached['voice_id'])
+            if self.tts_engine.getProperty('voice') != cached['voice_id']:
+                return False
+        except Exception:
+            return False  # No usable cache, or the engine rejected the voice (e.g. uninstalled)
+        
+        print(f"🗣️ Selected voice: {cached.get('voice_name', cached['voice_id'])}")
+        return True
+
+    def select_voice(self):
+        """Pick a voice by platform preference and remember it for the next run"""
+        voices = self.tts_engine.getProperty('voices')
+        
+        # Display available voices
+        print("Available voices:")
+        for i, voice in enumerate(voices[:5]):  # Show first 5 voices
+            gender = "♂️" if "male" in voice.name.lower() else "♀️"
+            print(f"  {i}: {gender} {voice.name}")
+        
+        selected_voice = None
+        
+        # Platform-specific voice selection
+        preferred = self.PREFERRED_VOICES.get(self.platform)
+        if preferred:
+            selected_voice = next((voice for voice in voices if preferred.search(voice.name.lower())), None)
+        
+        # Fallback to first available voice
+        if not selected_voice and len(voices) > 0:
+            selected_voice = voices[0]
+        
+        if not selected_voice:
+            print("⚠️ No voices available")
+            return
+        
+        self.tts_engine.setProperty('voice', selected_voice.id)
+        print(f"🗣️ Selected voice: {selected_voice.name}")
+        
+        try:
+            os.makedirs(os.path.dirname(self.VOICE_CACHE_FILE), exist_ok=True)
+            with open(self.VOICE_CACHE_FILE, "w") as f:
+                json.dump({
+                    'platform': self.platform,
+                    'voice_id': selected_voice.id,
+                    'voice_name': selected_voice.name
+                }, f)
+        except OSError as e:
+            self.log_error("Could not cache selected voice", e)
+
+    def speak_response(self, text, chime=True):
         """Make Steve actually speak the response"""
         print(f"💬 Steve: {text}")
         
@@ -960,8 +1217,9 @@ User said: {user_input}"""
             return
         
         try:
-            # Play speaking chime
-            self.play_speaking_chime()
+            # Play speaking chime (only before the first sentence of a streamed reply)
+            if chime:
+                self.play_speaking_chime()
             
             # Speak the response
             self.tts_engine.say(text)
@@ -974,77 +1232,40 @@ User said: {user_input}"""
     
     def play_listening_chime(self):
         """Play a gentle, soothing ascending chime when starting to listen"""
-        if not self.ENABLE_CHIMES:
-            return
-        
-        # Soft, warm ascending tones (C4, E4) - gentle interval
-        frequencies = [262, 330]  # C4, E4
-        durations = [60, 60]  # Very short, soft
-        self.play_chime_sequence(frequencies, durations, pause_between=0.02)
+        self.play_chime('listening')
 
     def play_conversation_start_chime(self):
-        if not self.ENABLE_CHIMES:
-            return
-        
         # Gentle welcome melody - soft and warm
-        frequencies = [262, 330, 392]  # C4, E4, G4 - gentle major triad
-        durations = [70, 70, 90]  # Short and sweet
-        self.play_chime_sequence(frequencies, durations, pause_between=0.03)
+        self.play_chime('conversation_start')
 
     def play_conversation_end_chime(self):
-        if not self.ENABLE_CHIMES:
-            return
-        
-        # Gentle farewell - soft descending
-        frequencies = [392, 330, 262]  # G4, E4, C4 - gentle descent
-        durations = [80, 90, 120]  # Gradually longer for gentle fade
-        self.play_chime_sequence(frequencies, durations, pause_between=0.04)
+        # Gentle farewell - soft descending, gradually longer for gentle fade
+        self.play_chime('conversation_end')
 
     def play_conversation_listening_chime(self):
-        if not self.ENABLE_CHIMES:
-            return
-        
-        # Very subtle, single soft tone
-        self.play_tone_cross_platform(294, 50)  # D4 for 50ms - very gentle and brief
+        # Very subtle, single soft tone; finishes before recording starts
+        self.play_chime('conversation_listening', background=False)
 
     def play_speaking_chime(self):
-        if not self.ENABLE_CHIMES:
-            return
-        
         # Very gentle, soft notification - just two quick soft tones
-        frequencies = [330, 392]  # E4, G4 - gentle ascending
-        durations = [40, 50]
-        self.play_chime_sequence(frequencies, durations, pause_between=0.02)
+        self.play_chime('speaking')
 
     def play_thinking_chime(self):
-        if not self.ENABLE_CHIMES:
-            return
-        
         # Gentle processing sound - soft descending tones
-        frequencies = [349, 330, 294]  # F4, E4, D4 - gentle descent
-        durations = [60, 60, 60]  # Short and soft
-        self.play_chime_sequence(frequencies, durations, pause_between=0.02)
+        self.play_chime('thinking')
 
     def play_ready_chime(self):
-        if not self.ENABLE_CHIMES:
-            return
-        
         # Simple, single gentle tone to indicate readiness
-        self.play_tone_cross_platform(330, 80)  # E4 for 80ms - warm and welcoming
+        self.play_chime('ready', background=False)
 
     def play_startup_chime(self):
-        if not self.ENABLE_CHIMES:
-            return
-        
         # Gentle startup melody - soft and welcoming
-        frequencies = [262, 330, 392, 523]  # C4, E4, G4, C5 - warm ascending
-        durations = [80, 80, 90, 120]  # Gentle progression
-        self.play_chime_sequence(frequencies, durations, pause_between=0.04)
+        self.play_chime('startup')
 
     # ... (All other helper methods remain the same) ...
     def normalize_text(self, text):
-        text = re.sub(r'[^\w\s]', ' ', text.lower())
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = self.NON_WORD_PATTERN.sub(' ', text.lower())
+        text = self.WHITESPACE_PATTERN.sub(' ', text).strip()
         return text
 
     def calibrate_audio(self):
@@ -1060,18 +1281,20 @@ User said: {user_input}"""
             frames_per_buffer=self.CHUNK
         )
         
-        levels = []
         for _ in range(0, int(self.RATE / self.CHUNK * 5)):
-            data = stream.read(self.CHUNK, exception_on_overflow=False)
-            level = self.get_audio_level(data)
-            levels.append(level)
+            frames.append(stream.read(self.CHUNK, exception_on_overflow=False))
         
         stream.stop_stream()
         stream.close()
         
-        if levels:
-            avg_level = np.mean(levels)
-            max_level = np.max(levels)
+        # Per-chunk RMS levels for the whole recording in one vectorized reduction
+        samples = np.frombuffer(b''.join(frames), dtype=np.int16)
+        samples = samples[:len(samples) - len(samples) % self.CHUNK].reshape(-1, self.CHUNK)
+        levels = np.sqrt(np.mean(np.square(samples, dtype=np.float64), axis=1))
+        
+        if levels.size:
+            avg_level = levels.mean()
+            max_level = levels.max()
             self.SILENCE_THRESHOLD = avg_level * 0.3
             
             print(f"📊 Calibration complete!")
@@ -1088,80 +1311,136 @@ User said: {user_input}"""
             audio_data = np.frombuffer(data, dtype=np.int16)
             if len(audio_data) == 0:
                 return 0
-            rms = np.sqrt(np.mean(audio_data.astype(np.float64)**2))
-            if np.isnan(rms) or np.isinf(rms):
-                return 0
-            return rms
+            # Exact integer sum of squares (int64 can't overflow for int16 samples)
+            audio_data = audio_data.astype(np.int64)
+            return math.sqrt(int(np.dot(audio_data, audio_data)) / len(audio_data))
         except Exception as e:
             print(f"Audio level error: {e}")
             return 0
 
-    def record_wake_word_check(self, duration=6):
-        """Record wake word check with secure file handling"""
-        frames = []
-        stream = None
-        temp_file = None
-        
-        try:
-            # Check system resources before recording
-            self.check_system_resources()
-            
-            # Create secure temporary file
-            temp_file = self.create_secure_temp_file(suffix=".wav", prefix="steve_wake_")
-            
-            stream = self.audio.open(
-                format=self.FORMAT,
-                channels=self.CHANNELS,
-                rate=self.RATE,
-                input=True,
-                frames_per_buffer=self.CHUNK
-            )
-            
-            for _ in range(0, int(self.RATE / self.CHUNK * duration)):
-                data = stream.read(self.CHUNK, exception_on_overflow=False)
-                frames.append(data)
-        
-        except Exception as e:
-            self.log_error("Recording error during wake word check", e)
-            
-        finally:
-            if stream:
-                stream.stop_stream()
-                stream.close()
-        
-        # Save to secure temporary file
-        if temp_file:
+    def start_wake_stream(self):
+        """Start continuous wake word capture into an empty ring buffer"""
+        with self.wake_lock:
+            self.wake_write_pos = 0
+            self.wake_filled = 0
+            self.wake_new_samples = 0
+            self.wake_total = 0
+            self.wake_read_total = 0
+            self.wake_ready.clear()
+        if self.wakeword_model is not None:
+            self.wakeword_model.reset()
+        
+        self.wake_stream = self.audio.open(
+            format=self.FORMAT,
+            channels=self.CHANNELS,
+            rate=self.RATE,
+            input=True,
+            frames_per_buffer=self.CHUNK,
+            stream_callback=self.wake_audio_callback
+        )
+
+    def stop_wake_stream(self):
+        """Stop wake word capture so other recordings get the microphone"""
+        if self.wake_stream is not None:
             try:
-                wf = wave.open(temp_file, 'wb')
-                wf.setnchannels(self.CHANNELS)
-                wf.setsampwidth(self.audio.get_sample_size(self.FORMAT))
-                wf.setframerate(self.RATE)
-                wf.writeframes(b''.join(frames))
-                wf.close()
+                self.wake_stream.stop_stream()
+                self.wake_stream.close()
             except Exception as e:
-                self.log_error("Failed to save wake word audio file", e)
-                if temp_file:
-                    self.secure_delete_file(temp_file)
-                return None
+                self.log_error("Error closing wake word stream", e)
+            self.wake_stream = None
+
+    def wake_audio_callback(self, in_data, frame_count, time_info, status):
+        """PortAudio callback: copy captured samples into the wake word ring buffer"""
+        samples = np.frombuffer(in_data, dtype=np.int16)
+        size = len(self.wake_ring)
+        if len(samples) > size:
+            samples = samples[-size:]
+        
+        with self.wake_lock:
+            pos = self.wake_write_pos
+            first = min(len(samples), size - pos)
+            self.wake_ring[pos:pos + first] = samples[:first]
+            self.wake_ring[:len(samples) - first] = samples[first:]
+            self.wake_write_pos = (pos + len(samples)) % size
+            self.wake_filled = min(self.wake_filled + len(samples), size)
+            self.wake_new_samples += len(samples)
+            self.wake_total += len(samples)
+            if self.wake_new_samples >= self.RATE * self.WAKE_HOP_SECONDS:
+                self.wake_ready.set()
+        
+        return (None, pyaudio.paContinue)
+
+    def check_wake_stream(self):
+        """Raise if the wake word stream stopped delivering audio (e.g. device unplugged)"""
+        if self.wake_stream is None or not self.wake_stream.is_active():
+            raise IOError("Wake word audio stream stopped")
+
+    def next_wake_window(self):
+        """Wait for the next hop of audio and return the latest window as float32"""
+        while not self.wake_ready.wait(timeout=0.5):
+            # Short waits keep Ctrl+C responsive and notice a dead stream
+            self.check_wake_stream()
+        
+        with self.wake_lock:
+            if self.wake_filled < len(self.wake_ring):
+                samples = self.wake_ring[:self.wake_filled].copy()
+            else:
+                pos = self.wake_write_pos
+                samples = np.concatenate((self.wake_ring[pos:], self.wake_ring[:pos]))
+            self.wake_new_samples = 0
+            self.wake_ready.clear()
+        
+        return self.samples_to_audio(samples)
+
+    def wait_for_wakeword(self):
+        """Score captured audio with the wake word model until it fires"""
+        frame_size = self.WAKEWORD_FRAME_SAMPLES
+        size = len(self.wake_ring)
         
-        return temp_file
+        # A fire always stops the stream, and start_wake_stream resets the model and the
+        # read position, so stale high scores can't fire twice
+        while True:
+            with self.wake_lock:
+                # Skip ahead if the callback has already overwritten unread audio
+                start = max(self.wake_read_total, self.wake_total - size)
+                if self.wake_total - start >= frame_size:
+                    frame = self.wake_ring[np.arange(start, start + frame_size) % size]
+                    self.wake_read_total = start + frame_size
+                else:
+                    frame = None
+            
+            if frame is None:
+                self.check_wake_stream()
+                time.sleep(0.02)
+                continue
+            
+            scores = self.wakeword_model.predict(frame)
+            if max(scores.values(), default=0) >= self.WAKEWORD_THRESHOLD:
+                return
+
+    def samples_to_audio(self, samples):
+        """Scale int16 samples to the float32 [-1, 1) range Whisper expects"""
+        audio = samples.astype(np.float32)
+        audio /= 32768.0
+        return audio
 
-    def check_wake_word(self, audio_file):
-        """Check wake word with secure file handling"""
-        if not audio_file:
+    def check_wake_word(self, audio):
+        """Check wake word in recorded audio"""
+        if audio is None:
             return False, ""
         
         try:
-            segments, info = self.whisper_model.transcribe(audio_file)
-            text = " ".join(segment.text for segment in segments).strip()
+            text = self.transcribe_audio(audio)
             print(f"Heard: '{text}'")
             
+            if self.ascii_wake is not None and self.ascii_wake not in self.ascii_normalize(text):
+                return False, text
+            
             normalized_text = self.normalize_text(text)
-            normalized_wake = self.normalize_text(self.WAKE_WORD)
             
             print(f"Normalized: '{normalized_text}'")
             
-            wake_detected = normalized_wake in normalized_text
+            wake_detected = self.normalized_wake in normalized_text
             
             if wake_detected:
                 self.log_security_event("Wake word detected", {
@@ -1174,30 +1453,19 @@ User said: {user_input}"""
         except Exception as e:
             self.log_error("Transcription error during wake word check", e)
             return False, ""
-        
-        finally:
-            # Always securely delete the temporary audio file
-            if audio_file:
-                self.secure_delete_file(audio_file)
+
+    def ascii_normalize(self, text):
+        """Lowercase, punctuation-free, single-spaced ASCII bytes of text.
+        
+        Contains the ASCII wake word whenever normalize_text's output does, so a miss
+        here safely skips the regex normalization.
+        """
+        cheap = text.encode('ascii', 'replace').lower().translate(self.ASCII_PUNCT_TO_SPACE)
+        return b" ".join(cheap.split())
 
     def check_goodbye(self, text):
         normalized_text = self.normalize_text(text)
-        normalized_goodbye = self.normalize_text(self.GOODBYE_WORD)
-        
-        goodbye_phrases = [
-            normalized_goodbye,
-            "goodbye",
-            "bye steve",
-            "see you later steve",
-            "talk to you later steve",
-            "end conversation"
-        ]
-        
-        for goodbye_phrase in goodbye_phrases:
-            if goodbye_phrase in normalized_text:
-                return True
-        
-        return False
+        return any(phrase in normalized_text for phrase in self.goodbye_phrases)
 
     def record_voice_command(self):
         """Record voice command with enhanced security and resource monitoring"""
@@ -1205,17 +1473,22 @@ User said: {user_input}"""
         self.play_listening_chime()
         time.sleep(0.3)
         
-        frames = []
+        max_recording_time = 20
+        # Preallocated sample buffer (one spare chunk for the read that crosses the limit)
+        samples = np.empty(self.RATE * max_recording_time + self.CHUNK, dtype=np.int16)
+        pos = 0
         stream = None
-        command_file = None
+        has_speech = False
+        start_time = time.time()
+        speculative = None  # Transcription of the speech before the current silence
+        speculative_job = None  # Most recently submitted speculative transcription
+        last_status_print = 0.0
+        self.pending_transcription = None
         
         try:
             # Check system resources before recording
             self.check_system_resources()
             
-            # Create secure temporary file
-            command_file = self.create_secure_temp_file(suffix=".wav", prefix="steve_cmd_")
-            
             stream = self.audio.open(
                 format=self.FORMAT,
                 channels=self.CHANNELS,
@@ -1224,42 +1497,58 @@ User said: {user_input}"""
                 frames_per_buffer=self.CHUNK
             )
             
+            self.reset_vad()
             silence_start = None
             recording = True
-            has_speech = False
             speech_start_time = None
-            max_recording_time = 20
-            start_time = time.time()
             
             print("📢 Speak now...")
             
             while recording:
                 try:
                     data = stream.read(self.CHUNK, exception_on_overflow=False)
-                    frames.append(data)
+                    chunk = np.frombuffer(data, dtype=np.int16)
+                    if pos + len(chunk) > len(samples):
+                        print("⏰ Maximum recording time reached")
+                        break
+                    samples[pos:pos + len(chunk)] = chunk
+                    pos += len(chunk)
                     
                     if time.time() - start_time > max_recording_time:
                         print("⏰ Maximum recording time reached")
                         break
                     
-                    audio_level = self.get_audio_level(data)
-                    
-                    if audio_level > self.SILENCE_THRESHOLD:
+                    if self.is_speech_chunk(data):
                         if not has_speech:
                             has_speech = True
                             speech_start_time = time.time()
                             print("🗣️ Detected speech...")
                         
                         silence_start = None
-                        print("🔊", end="", flush=True)
+                        if speculative is not None:
+                            # Speech resumed, the early transcript is stale
+                            speculative.cancel()
+                            speculative = None
+                        # Speech meter at most every 200 ms, not once per chunk
+                        now = time.monotonic()
+                        if now - last_status_print >= 0.2:
+                            last_status_print = now
+                            print("🔊", end="", flush=True)
                     else:
                         if has_speech and speech_start_time:
                             if time.time() - speech_start_time > self.MIN_SPEECH_DURATION:
                                 if silence_start is None:
                                     silence_start = time.time()
                                     print(" 🤫", end="", flush=True)
-                                elif time.time() - silence_start > self.SILENCE_DURATION:
+                                # Transcribe what was said so far while waiting out the silence,
+                                # keeping at most one speculative job in flight
+                                if speculative is None and (speculative_job is None or speculative_job.done()):
+                                    speculative = speculative_job = self.transcription_executor.submit(
+                                        self.transcribe_audio, self.samples_to_audio(samples[:pos])
+                                    )
+                                if time.time() - silence_start > self.SILENCE_DURATION:
                                     print(f"\n🔇 {self.SILENCE_DURATION}s silence detected, stopping")
+                                    self.pending_transcription = speculative
                                     recording = False
                 
                 except Exception as e:
@@ -1276,41 +1565,36 @@ User said: {user_input}"""
         
         print()
         
-        # Save command recording to secure file
-        if command_file:
-            try:
-                wf = wave.open(command_file, 'wb')
-                wf.setnchannels(self.CHANNELS)
-                wf.setsampwidth(self.audio.get_sample_size(self.FORMAT))
-                wf.setframerate(self.RATE)
-                wf.writeframes(b''.join(frames))
-                wf.close()
-                
-                # Log successful recording
-                self.log_security_event("Voice command recorded", {
-                    'duration_seconds': time.time() - start_time,
-                    'has_speech': has_speech
-                })
-                
-            except Exception as e:
-                self.log_error("Failed to save command audio file", e)
-                if command_file:
-                    self.secure_delete_file(command_file)
-                return None
+        # Log successful recording
+        self.log_security_event("Voice command recorded", {
+            'duration_seconds': time.time() - start_time,
+            'has_speech': has_speech
+        })
         
-        return command_file
+        return self.samples_to_audio(samples[:pos]) if pos else None
+
+    def transcribe_audio(self, audio):
+        """Run Whisper on float32 audio and return the joined transcript"""
+        segments, info = self.whisper_model.transcribe(
+            audio,
+            language=self.WHISPER_LANGUAGE,
+            vad_filter=self.WHISPER_VAD_FILTER
+        )
+        return " ".join(segment.text for segment in segments).strip()
 
-    def transcribe_command(self, audio_file):
-        """Transcribe voice command with secure file handling"""
-        if not audio_file:
+    def transcribe_command(self, audio):
+        """Transcribe recorded voice command audio"""
+        if audio is None:
             return None
         
         print("🧠 Transcribing...")
         start_time = time.time()
         
+        # Only the trailing silence followed the speculative transcript, so reuse it
+        pending, self.pending_transcription = self.pending_transcription, None
+        
         try:
-            segments, info = self.whisper_model.transcribe(audio_file)
-            text = " ".join(segment.text for segment in segments).strip()
+            text = pending.result() if pending is not None else self.transcribe_audio(audio)
             
             transcription_time = time.time() - start_time
             print(f"⚡ Transcribed in {transcription_time:.2f}s")
@@ -1327,23 +1611,14 @@ User said: {user_input}"""
         except Exception as e:
             self.log_error("Transcription error", e)
             return None
-        
-        finally:
-            # Always securely delete the temporary audio file
-            if audio_file:
-                self.secure_delete_file(audio_file)
 
     def extract_command_from_wake_phrase(self, full_text):
-        patterns = [
-            r'hey\s*,?\s*steve\s*,?\s*',
-            r'hi\s*,?\s*steve\s*,?\s*',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, full_text.lower())
+        lowered = full_text.lower()
+        for pattern in self.WAKE_PHRASE_PATTERNS:
+            match = pattern.search(lowered)
             if match:
                 command_part = full_text[match.end():].strip()
-                command_part = re.sub(r'^[,.\s]+', '', command_part)
+                command_part = self.LEADING_PUNCTUATION.sub('', command_part)
                 return command_part
         
         return ""
@@ -1357,11 +1632,7 @@ User said: {user_input}"""
                     'history_entries': len(self.conversation_history)
                 })
                 self.conversation_history.clear()
-            
-            # Secure cleanup of temporary files
-            if hasattr(self, 'temp_files'):
-                for temp_file in self.temp_files[:]:  # Copy list to avoid modification during iteration
-                    self.secure_delete_file(temp_file)
+                self.history_tokens = 0
             
             # Clear encryption keys from memory
             if hasattr(self, 'history_key'):
@@ -1373,7 +1644,15 @@ User said: {user_input}"""
             if hasattr(self, 'tts_engine') and self.tts_engine:
                 self.tts_engine.stop()
             
-            # Terminate audio
+            # Stop background transcription
+            if hasattr(self, 'transcription_executor'):
+                self.transcription_executor.shutdown(wait=False)
+            
+            # Close audio streams and terminate audio
+            if hasattr(self, 'wake_stream'):
+                self.stop_wake_stream()
+            if hasattr(self, 'tone_stream'):
+                self.close_tone_stream()
             if hasattr(self, 'audio'):
                 self.audio.terminate()
             
@@ -4,26 +4,128 @@ Platform Compatibility Test for Steve Voice Assistant
 Tests cross-platform audio and TTS functionality
 """
 
-import platform
+import io
+import math
+import re
+import shutil
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Operating system name (as platform.system() reports it), taken from sys.platform,
+# which is set at interpreter start-up, so the platform module is only needed for
+# other systems and the banner's release string
+if sys.platform == "darwin":
+    _PLATFORM = "Darwin"
+elif sys.platform.startswith("win"):
+    _PLATFORM = "Windows"
+elif sys.platform.startswith("linux"):
+    _PLATFORM = "Linux"
+else:
+    import platform
+    _PLATFORM = platform.system()
+
+# Report separators
+_SEPARATOR = "=" * 55
+_HEADER_BAR = "=" * 20
+
+# One exactly repeating block of samples per (frequency, sample_rate, volume)
+_TONE_PERIODS = {}
+
+def _tone_period(frequency, sample_rate, volume):
+    """Return the shortest int16 sample block that repeats the tone exactly"""
+    key = (frequency, sample_rate, volume)
+    if key not in _TONE_PERIODS:
+        import numpy as np
+        
+        # The waveform repeats after sample_rate / gcd(sample_rate, frequency) samples
+        # (2205 samples = 22 cycles for 440 Hz at 44.1 kHz)
+        period = sample_rate // math.gcd(sample_rate, frequency)
+        wave = np.arange(period, dtype=np.float32)
+        wave *= 2 * np.pi * frequency / sample_rate
+        np.sin(wave, out=wave)
+        wave *= volume * 32767
+        _TONE_PERIODS[key] = wave.astype(np.int16)
+    return _TONE_PERIODS[key]
+
+# pyttsx3 engine shared by all TTS checks (driver start-up is slow, especially SAPI)
+_ENGINE = None
+
+def _get_engine():
+    """Create the pyttsx3 engine on first use and reuse it afterwards"""
+    global _ENGINE
+    if _ENGINE is None:
+        import pyttsx3
+        _ENGINE = pyttsx3.init()
+    return _ENGINE
+
+# Installed voices, enumerated through the driver once
+_VOICES = None
+
+def _get_voices():
+    """Return the shared engine's voice list, querying the driver only the first time"""
+    global _VOICES
+    if _VOICES is None:
+        _VOICES = _get_engine().getProperty('voices')
+    return _VOICES
+
+class _ThreadOutput:
+    """sys.stdout stand-in that buffers output from threads running tests in parallel"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+    
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        return (self.stream if buffer is None else buffer).write(text)
+    
+    def flush(self):
+        self.stream.flush()
+    
+    def __getattr__(self, name):
+        # encoding, isatty(), fileno() etc. come from the real stream
+        return getattr(self.stream, name)
+
+def run_test(test_name, test_func):
+    """Run one test with its banner and verdict; return whether it passed"""
+    print(f"\n{_HEADER_BAR} {test_name} {_HEADER_BAR}")
+    try:
+        if test_func():
+            print(f"✅ {test_name} PASSED")
+            return True
+        print(f"❌ {test_name} FAILED")
+    except Exception as e:
+        print(f"❌ {test_name} ERROR: {e}")
+    return False
+
+def _run_test_buffered(test):
+    """Run a test in a worker thread, returning (passed, captured output)"""
+    buffer = io.StringIO()
+    sys.stdout.local.buffer = buffer
+    try:
+        return run_test(*test), buffer.getvalue()
+    finally:
+        sys.stdout.local.buffer = None
 
 def test_python_version():
     """Test Python version compatibility"""
     print("\n🐍 Testing Python version compatibility...")
     
     version_info = sys.version_info
-    version_str = f"{version_info.major}.{version_info.minor}.{version_info.micro}"
+    print(f"Python version: {version_info.major}.{version_info.minor}.{version_info.micro}")
     
-    print(f"Python version: {version_str}")
+    # Compare (major, minor) once against each cut-off
+    major_minor = version_info[:2]
     
     # Check minimum version
-    if version_info < (3, 8):
+    if major_minor < (3, 8):
         print("❌ Python 3.8 or higher is required")
         return False
     
     # Check for problematic versions
-    if version_info >= (3, 13):
+    if major_minor >= (3, 13):
         print("❌ CRITICAL: Python 3.13+ has known audio compatibility issues")
         print("   Whisper and audio libraries may not work correctly")
         print("   Recommended: Downgrade to Python 3.11 or 3.12")
@@ -31,7 +133,7 @@ def test_python_version():
         print("   - macOS: brew install python@3.11")
         print("   - pyenv: pyenv install 3.11.9 && pyenv local 3.11.9")
         return False
-    elif version_info >= (3, 12):
+    elif major_minor >= (3, 12):
         print("⚠️  Python 3.12 detected - should work but 3.11 is preferred")
         return True
     else:
@@ -64,7 +166,7 @@ def test_imports():
         return False
     
     # Test platform-specific imports
-    if platform.system() == "Windows":
+    if _PLATFORM == "Windows":
         try:
             import winsound
             print("✅ winsound available (Windows)")
@@ -73,6 +175,41 @@ def test_imports():
     
     return True
 
+def test_whisper_compatibility():
+    """Test that faster-whisper loads and can run the assistant's int8 models"""
+    print("\n🧠 Testing Whisper compatibility...")
+    
+    try:
+        import faster_whisper
+        print(f"✅ faster-whisper {faster_whisper.__version__} available")
+    except ImportError as e:
+        print(f"❌ faster-whisper not available: {e}")
+        return False
+    
+    try:
+        import ctranslate2
+        
+        # Steve loads Whisper int8-quantized (int8_float16 on CUDA)
+        cuda_devices = ctranslate2.get_cuda_device_count()
+        device = "cuda" if cuda_devices > 0 else "cpu"
+        compute_types = ctranslate2.get_supported_compute_types(device)
+        
+        if cuda_devices > 0:
+            print(f"✅ CUDA available ({cuda_devices} device(s))")
+        else:
+            print("ℹ️ No CUDA device, Whisper will run on the CPU")
+        
+        if not any(compute_type.startswith("int8") for compute_type in compute_types):
+            print(f"❌ No int8 compute type supported on {device}")
+            return False
+        
+        print(f"✅ int8 inference supported on {device}")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Whisper compatibility test failed: {e}")
+        return False
+
 def test_audio_system():
     """Test PyAudio audio system"""
     print("\n🎵 Testing audio system...")
@@ -81,31 +218,44 @@ def test_audio_system():
         import pyaudio
         audio = pyaudio.PyAudio()
         
-        # Check for input devices
-        input_devices = []
-        for i in range(audio.get_device_count()):
-            device_info = audio.get_device_info_by_index(i)
-            if device_info['maxInputChannels'] > 0:
-                input_devices.append(device_info['name'])
-        
-        # Check for output devices
-        output_devices = []
-        for i in range(audio.get_device_count()):
-            device_info = audio.get_device_info_by_index(i)
-            if device_info['maxOutputChannels'] > 0:
-                output_devices.append(device_info['name'])
-        
-        audio.terminate()
+        try:
+            # The default devices answer the pass/fail question without a full device sweep
+            try:
+                default_input = audio.get_default_input_device_info()
+                default_output = audio.get_default_output_device_info()
+                
+                print(f"✅ Default input: {default_input['name']}")
+                print(f"✅ Default output: {default_output['name']}")
+                return True
+            except IOError:
+                print("⚠️ No default input/output device, checking all devices...")
+            
+            # Count input and output devices in one pass, keeping only the first names
+            input_count = output_count = 0
+            first_input = first_output = None
+            for i in range(audio.get_device_count()):
+                device_info = audio.get_device_info_by_index(i)
+                if device_info['maxInputChannels'] > 0:
+                    input_count += 1
+                    if first_input is None:
+                        first_input = device_info['name']
+                if device_info['maxOutputChannels'] > 0:
+                    output_count += 1
+                    if first_output is None:
+                        first_output = device_info['name']
+        finally:
+            # Always release PortAudio, even when a device query fails
+            audio.terminate()
         
-        print(f"✅ Found {len(input_devices)} input device(s)")
-        print(f"✅ Found {len(output_devices)} output device(s)")
+        print(f"✅ Found {input_count} input device(s)")
+        print(f"✅ Found {output_count} output device(s)")
         
-        if input_devices:
-            print(f"   Primary input: {input_devices[0]}")
-        if output_devices:
-            print(f"   Primary output: {output_devices[0]}")
+        if first_input is not None:
+            print(f"   Primary input: {first_input}")
+        if first_output is not None:
+            print(f"   Primary output: {first_output}")
         
-        return len(input_devices) > 0 and len(output_devices) > 0
+        return input_count > 0 and output_count > 0
         
     except Exception as e:
         print(f"❌ Audio system test failed: {e}")
@@ -116,9 +266,7 @@ def test_tts_voices():
     print("\n🗣️ Testing TTS voices...")
     
     try:
-        import pyttsx3
-        engine = pyttsx3.init()
-        voices = engine.getProperty('voices')
+        voices = _get_voices()
         
         if not voices:
             print("❌ No TTS voices found")
@@ -127,28 +275,29 @@ def test_tts_voices():
         print(f"✅ Found {len(voices)} voice(s)")
         
         # Show platform-appropriate voices
-        platform_name = platform.system()
-        if platform_name == "Darwin":  # macOS
+        if _PLATFORM == "Darwin":  # macOS
             preferred_voices = ['alex', 'tom', 'daniel']
             print("🍎 macOS voices:")
-        elif platform_name == "Windows":
+        elif _PLATFORM == "Windows":
             preferred_voices = ['david', 'mark', 'zira']
             print("🪟 Windows voices:")
         else:
             preferred_voices = []
             print("🐧 Available voices:")
         
+        # One compiled alternation instead of a substring scan per preferred name
+        preferred_pattern = re.compile("|".join(map(re.escape, preferred_voices))) if preferred_voices else None
+        
         found_preferred = False
         for voice in voices[:5]:  # Show first 5
             voice_name = voice.name.lower()
-            is_preferred = any(pref in voice_name for pref in preferred_voices)
+            is_preferred = bool(preferred_pattern and preferred_pattern.search(voice_name))
             if is_preferred:
                 found_preferred = True
                 print(f"   ✅ {voice.name} (preferred)")
             else:
                 print(f"   📢 {voice.name}")
         
-        engine.stop()
         return True
         
     except Exception as e:
@@ -163,6 +312,13 @@ def test_tone_generation():
         import numpy as np
         import pyaudio
         
+        # Test playback (optional - user can skip); the tone is only built if it will play
+        test_playback = input("🔊 Test audio playback? (y/n): ").lower().strip()
+        
+        if test_playback not in ['y', 'yes']:
+            print("✅ Tone generation skipped")
+            return True
+        
         # Generate a simple test tone
         frequency = 440  # A4
         duration_ms = 100
@@ -172,18 +328,13 @@ def test_tone_generation():
         duration_s = duration_ms / 1000.0
         frames = int(duration_s * sample_rate)
         
-        # Generate sine wave
-        t = np.linspace(0, duration_s, frames, False)
-        wave_data = np.sin(2 * np.pi * frequency * t)
-        wave_data = (wave_data * volume * 32767).astype(np.int16)
+        # Generate sine wave by repeating one precomputed period
+        wave_data = np.resize(_tone_period(frequency, sample_rate, volume), frames)
         
         print("✅ Tone generation successful")
         
-        # Test playback (optional - user can skip)
-        test_playback = input("🔊 Test audio playback? (y/n): ").lower().strip()
-        
-        if test_playback in ['y', 'yes']:
-            audio = pyaudio.PyAudio()
+        audio = pyaudio.PyAudio()
+        try:
             stream = audio.open(
                 format=pyaudio.paInt16,
                 channels=1,
@@ -195,9 +346,10 @@ def test_tone_generation():
             stream.write(wave_data.tobytes())
             stream.stop_stream()
             stream.close()
+        finally:
             audio.terminate()
-            
-            print("✅ Audio playback test completed")
+        
+        print("✅ Audio playback test completed")
         
         return True
         
@@ -207,15 +359,14 @@ def test_tone_generation():
 
 def test_platform_specific():
     """Test platform-specific features"""
-    print(f"\n🖥️ Testing {platform.system()}-specific features...")
-    
-    platform_name = platform.system()
+    print(f"\n🖥️ Testing {_PLATFORM}-specific features...")
     
-    if platform_name == "Darwin":  # macOS
+    if _PLATFORM == "Darwin":  # macOS
         # Test Metal GPU detection
         try:
             import subprocess
-            result = subprocess.run(['system_profiler', 'SPDisplaysDataType'], 
+            # Minimal detail level skips the slow, verbose parts of the display report
+            result = subprocess.run(['system_profiler', 'SPDisplaysDataType', '-detailLevel', 'mini'],
                                   capture_output=True, text=True, timeout=5)
             if 'Metal' in result.stdout:
                 print("✅ Metal GPU support detected")
@@ -224,7 +375,7 @@ def test_platform_specific():
         except:
             print("⚠️ Could not check Metal GPU support")
     
-    elif platform_name == "Windows":
+    elif _PLATFORM == "Windows":
         # Test winsound
         try:
             import winsound
@@ -238,19 +389,16 @@ def test_platform_specific():
         except Exception as e:
             print(f"❌ winsound test failed: {e}")
     
-    elif platform_name == "Linux":
+    elif _PLATFORM == "Linux":
         # Test ALSA/PulseAudio
         print("🐧 Linux audio system detected")
         try:
-            import subprocess
-            # Check for ALSA
-            result = subprocess.run(['which', 'aplay'], capture_output=True)
-            if result.returncode == 0:
+            # Check for ALSA (PATH lookup in-process, no `which` subprocess)
+            if shutil.which('aplay'):
                 print("✅ ALSA detected")
             
             # Check for PulseAudio
-            result = subprocess.run(['which', 'pulseaudio'], capture_output=True)
-            if result.returncode == 0:
+            if shutil.which('pulseaudio'):
                 print("✅ PulseAudio detected")
         except:
             print("⚠️ Could not check Linux audio system")
@@ -260,36 +408,45 @@ def test_platform_specific():
 def main():
     """Run all platform tests"""
     print("🤖 Steve Voice Assistant - Platform Compatibility Test")
-    print("=" * 55)
-    print(f"Platform: {platform.system()} {platform.release()}")
+    print(_SEPARATOR)
+    import platform
+    print(f"Platform: {_PLATFORM} {platform.release()}")
     print(f"Python: {sys.version}")
-    print("=" * 55)
+    print(_SEPARATOR)
     
-    tests = [
+    # Independent, non-interactive tests run concurrently
+    parallel_tests = [
         ("Python Version Test", test_python_version),
         ("Import Test", test_imports),
         ("Whisper Compatibility Test", test_whisper_compatibility),
         ("Audio System Test", test_audio_system),
+    ]
+    # TTS stays on the main thread (pyttsx3 drivers are thread-bound); the others prompt
+    sequential_tests = [
         ("TTS Voices Test", test_tts_voices),
         ("Tone Generation Test", test_tone_generation),
         ("Platform-Specific Test", test_platform_specific),
     ]
     
     passed = 0
-    total = len(tests)
+    total = len(parallel_tests) + len(sequential_tests)
     
-    for test_name, test_func in tests:
-        print(f"\n{'='*20} {test_name} {'='*20}")
-        try:
-            if test_func():
-                passed += 1
-                print(f"✅ {test_name} PASSED")
-            else:
-                print(f"❌ {test_name} FAILED")
-        except Exception as e:
-            print(f"❌ {test_name} ERROR: {e}")
+    # Each parallel test's output is buffered and printed in order once it finishes
+    stdout = sys.stdout
+    sys.stdout = _ThreadOutput(stdout)
+    try:
+        with ThreadPoolExecutor(max_workers=len(parallel_tests)) as executor:
+            for test_passed, output in executor.map(_run_test_buffered, parallel_tests):
+                print(output, end="")
+                passed += test_passed
+    finally:
+        sys.stdout = stdout
+    
+    for test_name, test_func in sequential_tests:
+        if run_test(test_name, test_func):
+            passed += 1
     
-    print("\n" + "=" * 55)
+    print("\n" + _SEPARATOR)
     print(f"🧪 Test Results: {passed}/{total} tests passed")
     
     if passed == total: